@@ -108,7 +108,8 @@ BAYCOX_DEFAULT_PARAMS = {
     'n_samples_test': 100,
     'batch_size': 32,
     'early_stop': True,
-    'patience': 50
+    'patience': 50,
+    'inference_dtype': 'float32'
 }
 
 
@@ -127,6 +128,7 @@ BAYMTLR_DEFAULT_PARAMS = {
     'n_samples_test': 100,
     'batch_size': 32,
     'early_stop': True,
-    'patience': 50
+    'patience': 50,
+    'inference_dtype': 'float32'
 }
 
@@ -11,7 +11,7 @@ METRIC_NAMES = ["TrainLoss", "TrainVariance", "ValidLoss", "ValidVariance"]
 
 if __name__ == "__main__":
     path = Path.joinpath(pt.RESULTS_DIR, f"baysurv_training_results.csv")
-    results = pd.read_csv(path)
+    results = pd.read_csv(path, engine="pyarrow")
     results = results.round(3)
     for dataset in DATASETS:
         plot.plot_training_curves(results, dataset, MODEL_NAMES, METRIC_NAMES)
@@ -7,8 +7,9 @@ from utility.model import map_model_name
 
 if __name__ == "__main__":
     path = Path.joinpath(pt.RESULTS_DIR, f"baysurv_test_results.csv")
-    results = pd.read_csv(path)
+    results = pd.read_csv(path, engine="pyarrow")
     results = results.round(3)
+    by_key = {key: group.iloc[0] for key, group in results.groupby(['DatasetName', 'ModelName'])}
     
     model_names = ["mlp", "sngp", "vi", "mcd1", "mcd2", "mcd3"]
     dataset_names = ["METABRIC", "SEER", "SUPPORT", "MIMIC"]
@@ -19,7 +20,7 @@ if __name__ == "__main__":
                 text = "+ "
             else:
                 text = ""
-            res = results.loc[(results['DatasetName'] == dataset_name) & (results['ModelName'] == model_name)]
+            res = by_key[(dataset_name, model_name)]
             ici = float(res['ICI'])
             d_calib = float(res['DCalib'])
             c_calib = float(res['CCalib'])
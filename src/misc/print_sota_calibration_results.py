@@ -5,8 +5,9 @@ from utility.model import map_model_name
 
 if __name__ == "__main__":
     path = Path.joinpath(pt.RESULTS_DIR, f"sota_results.csv")
-    results = pd.read_csv(path)
+    results = pd.read_csv(path, engine="pyarrow")
     results = results.round(3)
+    by_key = {key: group.iloc[0] for key, group in results.groupby(['DatasetName', 'ModelName'])}
 
     model_names = ["cox", "coxnet", "coxboost", "rsf", "dsm", "dcm", "baycox", "baymtlr"]
     dataset_names = ["METABRIC", "SEER", "SUPPORT", "MIMIC"]
@@ -18,8 +19,8 @@ if __name__ == "__main__":
     for dataset_name in dataset_names:
         for index, (model_name, model_citation) in enumerate(zip(model_names, model_citations)):
             text = ""
-            res = results.loc[(results['DatasetName'] == dataset_name) & (results['ModelName'] == model_name)]
-            if res.empty:
+            res = by_key.get((dataset_name, model_name))
+            if res is None:
                 break
             ici = float(res['ICI'])
             d_calib = float(res['DCalib'])
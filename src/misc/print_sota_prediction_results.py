@@ -7,8 +7,9 @@ from utility.model import map_model_name
 
 if __name__ == "__main__":
     path = Path.joinpath(pt.RESULTS_DIR, f"sota_results.csv")
-    results = pd.read_csv(path)
+    results = pd.read_csv(path, engine="pyarrow")
     results = results.round(3)
+    by_key = {key: group.iloc[0] for key, group in results.groupby(['DatasetName', 'ModelName'])}
     
     model_names = ["cox", "coxnet", "coxboost", "rsf", "dsm", "dcm", "baycox", "baymtlr"]
     dataset_names = ["METABRIC", "SEER", "SUPPORT", "MIMIC"]
@@ -20,8 +21,8 @@ if __name__ == "__main__":
     for dataset_name in dataset_names:
         for index, (model_citation ,model_name) in enumerate(zip(model_citations, model_names)):
             text = ""
-            res = results.loc[(results['DatasetName'] == dataset_name) & (results['ModelName'] == model_name)]
-            if res.empty:
+            res = by_key.get((dataset_name, model_name))
+            if res is None:
                 break
             ci = float(res['CI'])
             mae_h = float(res['MAEHinge'])
@@ -88,9 +88,9 @@ if __name__ == "__main__":
         X_train, X_valid, X_test = scale_data(X_train, X_valid, X_test, cat_features, num_features)
         
         # Convert to array
-        X_train = np.array(X_train)
-        X_valid = np.array(X_valid)
-        X_test = np.array(X_test)
+        X_train = X_train.to_numpy()
+        X_valid = X_valid.to_numpy()
+        X_test = X_test.to_numpy()
 
         # Make time/event split
         t_train, e_train = split_time_event(y_train)
@@ -99,6 +99,7 @@ if __name__ == "__main__":
 
         # Make event times
         time_bins = make_time_bins(t_train, event=e_train)
+        time_bins_arr = time_bins.numpy()
         
         # Calculate quantiles
         event_times_pct = calculate_percentiles(time_bins)
@@ -169,41 +170,39 @@ if __name__ == "__main__":
                 surv_preds = compute_deterministic_survival_curve(model, X_train, X_test,
                                                                   e_train, t_train, time_bins, model_name)
             else:
-                surv_preds = np.mean(compute_nondeterministic_survival_curve(model, np.array(X_train), np.array(X_test),
-                                                                             e_train, t_train, time_bins,
-                                                                             n_samples_train, n_samples_test), axis=0)
+                surv_probs = compute_nondeterministic_survival_curve(model, X_train, X_test,
+                                                                     e_train, t_train, time_bins,
+                                                                     n_samples_train, n_samples_test)
+                surv_preds = np.mean(surv_probs, axis=0)
             test_time = time() - test_start_time
             
             # Make dataframe
-            surv_preds = pd.DataFrame(surv_preds, columns=time_bins.numpy())
+            surv_preds = pd.DataFrame(surv_preds, columns=time_bins_arr)
             
             # Sanitize
             surv_preds = surv_preds.fillna(0).replace([np.inf, -np.inf], 0)
             bad_idx = surv_preds[surv_preds.iloc[:,0] < 0.5].index # check we have a median
             sanitized_surv_preds = surv_preds.drop(bad_idx).reset_index(drop=True)
             sanitized_y_test = np.delete(y_test, bad_idx, axis=0)
-            sanitized_x_test = np.delete(X_test, bad_idx, axis=0)
             sanitized_t_test = np.delete(t_test, bad_idx, axis=0)
             sanitized_e_test = np.delete(e_test, bad_idx, axis=0)
 
             # Compute metrics
-            lifelines_eval = LifelinesEvaluator(sanitized_surv_preds.T, sanitized_y_test["time"], sanitized_y_test["event"], t_train, e_train)
+            sanitized_surv_test = sanitized_surv_preds.T # times x samples for the evaluators
+            lifelines_eval = LifelinesEvaluator(sanitized_surv_test, sanitized_y_test["time"], sanitized_y_test["event"], t_train, e_train)
             ibs = lifelines_eval.integrated_brier_score()
             mae_hinge = lifelines_eval.mae(method="Hinge")
             mae_pseudo = lifelines_eval.mae(method="Pseudo_obs")
             d_calib = lifelines_eval.d_calibration()[0] # 1 if lifelines_eval.d_calibration()[0] > 0.05 else 0
             km_mse = lifelines_eval.km_calibration()
-            ev = EvalSurv(sanitized_surv_preds.T, sanitized_y_test["time"], sanitized_y_test["event"], censor_surv="km")
-            inbll = ev.integrated_nbll(time_bins.numpy())
+            ev = EvalSurv(sanitized_surv_test, sanitized_y_test["time"], sanitized_y_test["event"], censor_surv="km")
+            inbll = ev.integrated_nbll(time_bins_arr)
             ci = ev.concordance_td()
             
             # Calculate C-cal for BNN models
             if model_name in ["vi", "mcd1", "mcd2", "mcd3"]:
-                surv_probs = compute_nondeterministic_survival_curve(model, X_train, sanitized_x_test,
-                                                                     e_train, t_train, time_bins,
-                                                                     n_samples_train, n_samples_test)
                 credible_region_sizes = np.arange(0.1, 1, 0.1)
-                surv_times = torch.from_numpy(surv_probs)
+                surv_times = torch.from_numpy(np.delete(surv_probs, bad_idx, axis=1)) # reuse test samples
                 coverage_stats = {}
                 for percentage in credible_region_sizes:
                     drop_num = math.floor(0.5 * n_samples_test * (1 - percentage))
@@ -214,6 +213,7 @@ if __name__ == "__main__":
                 data = [list(coverage_stats.keys()), list(coverage_stats.values())]
                 _, pvalue = chisquare(data)
                 c_calib = pvalue[0]
+                del surv_probs, surv_times, lower_outputs, upper_outputs # release the sample curves
             else:
                 c_calib = 0
             
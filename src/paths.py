@@ -20,4 +20,5 @@ DCM_CONFIGS_DIR = Path.joinpath(CONFIGS_DIR, 'dcm')
 DCPH_CONFIGS_DIR = Path.joinpath(CONFIGS_DIR, 'dcph')
 BAYCOX_CONFIGS_DIR = Path.joinpath(CONFIGS_DIR, 'baycox')
 BAYMTLR_CONFIGS_DIR = Path.joinpath(CONFIGS_DIR, 'baymtlr')
-RESULTS_DIR = Path.joinpath(ROOT_DIR, 'results')
\ No newline at end of file
+RESULTS_DIR = Path.joinpath(ROOT_DIR, 'results')
+CACHE_DIR = Path.joinpath(ROOT_DIR, 'cache')
\ No newline at end of file
@@ -11,9 +11,9 @@ class Trainer:
         self.model = model
         self.model_name = model_name
 
-        self.train_ds = train_dataset
-        self.valid_ds = valid_dataset
-        self.test_ds = test_dataset
+        self.train_ds = self._prepare_dataset(train_dataset)
+        self.valid_ds = self._prepare_dataset(valid_dataset)
+        self.test_ds = self._prepare_dataset(test_dataset)
 
         self.optimizer = optimizer
         self.loss_fn = loss_function
@@ -26,8 +26,17 @@ class Trainer:
         self.train_loss_metric = tf.keras.metrics.Mean(name="train_loss")
         self.valid_loss_metric = tf.keras.metrics.Mean(name="valid_loss")
         self.test_loss_metric = tf.keras.metrics.Mean(name="test_loss")
-        self.train_loss, self.valid_loss = list(), list()
-        self.train_variance, self.valid_variance = list(), list()
+        self.train_variance_metric = tf.keras.metrics.Mean(name="train_variance")
+        self.valid_variance_metric = tf.keras.metrics.Mean(name="valid_variance")
+        self.test_variance_metric = tf.keras.metrics.Mean(name="test_variance")
+        self.train_loss, self.train_variance = np.empty((2, 0), dtype=np.float32)
+        self.valid_loss, self.valid_variance = np.empty((2, 0), dtype=np.float32)
+        self.test_loss, self.test_variance = np.empty((2, 0), dtype=np.float32)
+        
+        # Per-epoch (loss, variance) kept on device until training has finished
+        self.train_history = tf.Variable(tf.zeros((2, num_epochs)), trainable=False)
+        self.valid_history = tf.Variable(tf.zeros((2, num_epochs)), trainable=False)
+        self.test_history = tf.Variable(tf.zeros((2, num_epochs)), trainable=False)
                 
         self.early_stop = early_stop
         self.patience = patience
@@ -37,9 +46,13 @@ class Trainer:
         
         self.checkpoint = tf.train.Checkpoint(optimizer=self.optimizer, model=self.model)
         self.manager = tf.train.CheckpointManager(self.checkpoint, directory=f"{pt.MODELS_DIR}", max_to_keep=num_epochs)
+
+        # Bind and trace the per-model steps once instead of dispatching on the model name per batch
+        self._make_steps(train_dataset)
         
     def train_and_evaluate(self):
         stop_training = False
+        n_epochs = 0
         for epoch in range(1, self.num_epochs+1):
             if epoch > 0 and self.model_name == "sngp":
                 self.model.layers[-1].reset_covariance_matrix() # reset covmat for SNGP
@@ -47,97 +60,29 @@ class Trainer:
             if self.valid_ds is not None:
                 stop_training = self.validate(epoch)
             if self.test_ds is not None:
-                self.test()
+                self.test(epoch)
+            n_epochs = epoch
             if stop_training:
                 self.cleanup()
                 break
             self.cleanup()
+        self._collect_history(n_epochs)
 
     def train(self, epoch):
-        batch_variances = list()
-        runs = self.n_samples_train
         for x, y in self.train_ds:
-            y_event = tf.expand_dims(y["label_event"], axis=1)
-            n_samples = y_event.shape[0]
-            with tf.GradientTape() as tape:
-                if self.model_name == "mlp":
-                    logits = self.model(x, training=True)
-                    batch_variances.append(0)
-                    loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-                elif self.model_name == "sngp":
-                    logits, covmat = self.model(x, training=True)
-                    batch_variances.append(np.mean(tf.linalg.diag_part(covmat)[:, None]))
-                    loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-                elif self.model_name == "vi":
-                    logits_dist = self.model(x, training=True)
-                    logits_cpd = tf.stack([tf.reshape(logits_dist.sample(), n_samples) for _ in range(runs)])
-                    batch_variances.append(np.mean(tf.math.reduce_variance(logits_cpd, axis=0, keepdims=True)))
-                    logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
-                    cox_loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_mean)
-                    self.train_loss_metric.update_state(cox_loss)
-                    loss = cox_loss + tf.reduce_mean(self.model.losses) # CoxPHLoss + KL-divergence
-                elif self.model_name in ["mcd1", "mcd2", "mcd3"]:
-                    logits_dist = self.model(x, training=True)
-                    logits_cpd = tf.stack([tf.reshape(logits_dist.sample(), n_samples) for _ in range(runs)])
-                    batch_variances.append(np.mean(tf.math.reduce_variance(logits_cpd, axis=0, keepdims=True)))
-                    logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
-                    loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_mean)
-                else:
-                    raise NotImplementedError()
-                self.train_loss_metric.update_state(loss)
-            with tf.name_scope("gradients"):
-                grads = tape.gradient(loss, self.model.trainable_weights)
-                self.optimizer.apply_gradients(zip(grads, self.model.trainable_weights))
-        epoch_loss = self.train_loss_metric.result()
-        self.train_loss.append(float(epoch_loss))
-        
-        print(f"Epoch loss: {epoch_loss}")
-                
-        # Track variance
-        if len(batch_variances) > 0:
-            self.train_variance.append(float(np.mean(batch_variances)))
-        
+            self._train_step(x, y["label_event"], y["label_riskset"])
+        self._record_epoch(self.train_history, epoch, self.train_loss_metric, self.train_variance_metric)
         self.manager.save()
 
     def validate(self, epoch):
         stop_training = False
-        runs = self.n_samples_valid
-        batch_variances = list()
         for x, y in self.valid_ds:
-            y_event = tf.expand_dims(y["label_event"], axis=1)
-            n_samples = y_event.shape[0]
-            if self.model_name == "mlp":
-                logits = self.model(x, training=False)
-                batch_variances.append(0) # zero variance for MLP
-                loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-            elif self.model_name == "sngp":
-                logits, covmat = self.model(x, training=False)
-                batch_variances.append(np.mean(tf.linalg.diag_part(covmat)[:, None]))
-                loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-            elif self.model_name == "vi":
-                logits_dist = self.model(x, training=False)
-                logits_cpd = tf.stack([tf.reshape(logits_dist.sample(), n_samples) for _ in range(runs)])
-                batch_variances.append(np.mean(tf.math.reduce_variance(logits_cpd, axis=0, keepdims=True)))
-                logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
-                cox_loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_mean)
-                self.train_loss_metric.update_state(cox_loss)
-                loss = cox_loss + tf.reduce_mean(self.model.losses) # CoxPHLoss + KL-divergence
-            elif self.model_name in ["mcd1", "mcd2", "mcd3"]:
-                logits_dist = self.model(x, training=False)
-                logits_cpd = tf.stack([tf.reshape(logits_dist.sample(), n_samples) for _ in range(runs)])
-                batch_variances.append(np.mean(tf.math.reduce_variance(logits_cpd, axis=0, keepdims=True)))
-                logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
-                loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_mean)
-            self.valid_loss_metric.update_state(loss)
-        epoch_loss = self.valid_loss_metric.result()
-        self.valid_loss.append(float(epoch_loss))
-
-        # Track variance
-        if len(batch_variances) > 0:
-            self.valid_variance.append(float(np.mean(batch_variances)))
+            self._valid_step(x, y["label_event"], y["label_riskset"])
+        self._record_epoch(self.valid_history, epoch, self.valid_loss_metric, self.valid_variance_metric)
 
         # Early stopping
         if self.early_stop:
+            epoch_loss = float(self.valid_loss_metric.result())
             print(f"{self.model_name} - {epoch}/{self.num_epochs} - {epoch_loss} - {self.best_valid_nll}")
             if self.best_valid_nll > epoch_loss:
                 self.best_valid_nll = epoch_loss
@@ -150,46 +95,167 @@ class Trainer:
                 
         return stop_training
 
-    def test(self):
-        batch_variances = list()
+    def test(self, epoch):
         for x, y in self.test_ds:
-            y_event = tf.expand_dims(y["label_event"], axis=1)
-            if self.model_name in ["MLP-ALEA", "VI", "VI-EPI", "MCD-EPI", "MCD"]:
-                runs = self.n_samples_test
-                logits_cpd = np.zeros((runs, len(x)), dtype=np.float32)
-                for i in range(0, runs):
-                    if self.model_name in ["MLP-ALEA", "VI", "MCD"]:
-                        logits_cpd[i,:] = np.reshape(self.model(x, training=False).sample(), len(x))
-                    else:
-                        logits_cpd[i,:] = np.reshape(self.model(x, training=False), len(x))
-                logits_mean = tf.transpose(tf.reduce_mean(logits_cpd, axis=0, keepdims=True))
-                batch_variances.append(np.mean(tf.math.reduce_variance(logits_cpd, axis=0, keepdims=True)))
-                
-                #logits = self.model(x, training=False)
-                if isinstance(self.loss_fn, CoxPHLoss):
-                    loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_mean)
-                else:
-                    loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits_cpd)
-                self.test_loss_metric.update_state(loss)
-            elif self.model_name == "SNGP":
-                logits, covmat = self.model(x, training=False)
-                batch_variances.append(np.mean(tf.linalg.diag_part(covmat)[:, None]))
-                loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-                self.test_loss_metric.update_state(loss)
-            else:
-                logits = self.model(x, training=False)
-                batch_variances.append(0) # zero variance for MLP
-                loss = self.loss_fn(y_true=[y_event, y["label_riskset"]], y_pred=logits)
-                self.test_loss_metric.update_state(loss)
-         
-        # Track variance
-        if len(batch_variances) > 0:
-            self.test_variance.append(float(np.mean(batch_variances)))
-
-        epoch_loss = self.test_loss_metric.result()
-        self.test_loss_scores.append(float(epoch_loss))
+            self._test_step(x, y["label_event"], y["label_riskset"])
+        self._record_epoch(self.test_history, epoch, self.test_loss_metric, self.test_variance_metric)
+
+    @tf.function(jit_compile=True)
+    def _sample_test_logits(self, x):
+        """Draw `n_samples_test` predictions per sample in a single forward pass.
+
+        The batch is tiled `runs` times so the stochastic layers draw independent
+        noise for every copy, then the samples are folded back to (runs, batch).
+        """
+        runs = self.n_samples_test
+        logits = self.model(tf.tile(x, [runs, 1]), training=False).sample()
+        return tf.reshape(logits, (runs, -1))
 
     def cleanup(self):
         self.train_loss_metric.reset_states()
         self.valid_loss_metric.reset_states()
         self.test_loss_metric.reset_states()
+        self.train_variance_metric.reset_states()
+        self.valid_variance_metric.reset_states()
+        self.test_variance_metric.reset_states()
+
+    def _collect_history(self, n_epochs):
+        # Copy the recorded epochs to the host in one transfer per split
+        self.train_loss, self.train_variance = self.train_history[:, :n_epochs].numpy()
+        if self.valid_ds is not None:
+            self.valid_loss, self.valid_variance = self.valid_history[:, :n_epochs].numpy()
+        if self.test_ds is not None:
+            self.test_loss, self.test_variance = self.test_history[:, :n_epochs].numpy()
+
+    @staticmethod
+    def _record_epoch(history, epoch, loss_metric, variance_metric):
+        history[:, epoch-1].assign(tf.stack([loss_metric.result(), variance_metric.result()]))
+
+    def _prepare_dataset(self, dataset):
+        if dataset is None:
+            return None
+        # Survival datasets here fit in memory, so cache the batches after the first epoch
+        return dataset.cache().prefetch(tf.data.AUTOTUNE)
+
+    def _make_steps(self, dataset):
+        train_steps = {"mlp": self._train_mlp_step, "sngp": self._train_sngp_step,
+                       "vi": self._train_vi_step, "mcd1": self._train_mcd_step,
+                       "mcd2": self._train_mcd_step, "mcd3": self._train_mcd_step}
+        valid_steps = {"mlp": self._valid_mlp_step, "sngp": self._valid_sngp_step,
+                       "vi": self._valid_vi_step, "mcd1": self._valid_mcd_step,
+                       "mcd2": self._valid_mcd_step, "mcd3": self._valid_mcd_step}
+        test_steps = {"mlp": self._test_mlp_step, "sngp": self._test_sngp_step,
+                      "vi": self._test_sample_step, "mcd1": self._test_sample_step,
+                      "mcd2": self._test_sample_step, "mcd3": self._test_sample_step}
+        if self.model_name not in train_steps:
+            raise NotImplementedError()
+        n_features = dataset.element_spec[0].shape[-1]
+        input_signature = [tf.TensorSpec(shape=(None, n_features), dtype=tf.float32),
+                           tf.TensorSpec(shape=(None, 1), dtype=tf.int32),
+                           tf.TensorSpec(shape=(None, None), dtype=tf.bool)]
+        jit_compile = self.model_name != "sngp" # GP head updates its covariance in-place
+        self._train_step = self._compile_step(train_steps[self.model_name], self.train_loss_metric,
+                                              self.train_variance_metric, input_signature, jit_compile)
+        self._valid_step = self._compile_step(valid_steps[self.model_name], self.valid_loss_metric,
+                                              self.valid_variance_metric, input_signature, jit_compile)
+        self._test_step = self._compile_step(test_steps[self.model_name], self.test_loss_metric,
+                                             self.test_variance_metric, input_signature, jit_compile)
+
+    @staticmethod
+    def _compile_step(step_fn, loss_metric, variance_metric, input_signature, jit_compile):
+        # Update the epoch metrics inside the graph so a step is a single call per batch
+        def step(x, y_event, riskset):
+            loss, variance = step_fn(x, y_event, riskset)
+            loss_metric.update_state(loss)
+            variance_metric.update_state(variance)
+        return tf.function(step, input_signature=input_signature, jit_compile=jit_compile)
+
+    def _apply_gradients(self, tape, loss):
+        with tf.name_scope("gradients"):
+            grads = tape.gradient(loss, self.model.trainable_weights)
+            self.optimizer.apply_gradients(zip(grads, self.model.trainable_weights))
+
+    def _sample_train_logits(self, x):
+        runs = self.n_samples_train
+        logits_dist = self.model(x, training=True)
+        return tf.reshape(logits_dist.sample(runs), (runs, -1))
+
+    def _train_mlp_step(self, x, y_event, riskset):
+        with tf.GradientTape() as tape:
+            logits = self.model(x, training=True)
+            loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        self._apply_gradients(tape, loss)
+        return loss, tf.constant(0, dtype=tf.float32)
+
+    def _train_sngp_step(self, x, y_event, riskset):
+        with tf.GradientTape() as tape:
+            logits, covmat = self.model(x, training=True)
+            loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        self._apply_gradients(tape, loss)
+        return loss, tf.reduce_mean(tf.linalg.diag_part(covmat))
+
+    def _train_vi_step(self, x, y_event, riskset):
+        with tf.GradientTape() as tape:
+            logits_cpd = self._sample_train_logits(x)
+            logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
+            cox_loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_mean)
+            loss = cox_loss + tf.reduce_mean(self.model.losses) # CoxPHLoss + KL-divergence
+        self._apply_gradients(tape, loss)
+        self.train_loss_metric.update_state(cox_loss)
+        return loss, tf.reduce_mean(tf.math.reduce_variance(logits_cpd, axis=0))
+
+    def _train_mcd_step(self, x, y_event, riskset):
+        with tf.GradientTape() as tape:
+            logits_cpd = self._sample_train_logits(x)
+            logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
+            loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_mean)
+        self._apply_gradients(tape, loss)
+        return loss, tf.reduce_mean(tf.math.reduce_variance(logits_cpd, axis=0))
+
+    def _valid_mlp_step(self, x, y_event, riskset):
+        logits = self.model(x, training=False)
+        loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        return loss, tf.constant(0, dtype=tf.float32) # zero variance for MLP
+
+    def _valid_sngp_step(self, x, y_event, riskset):
+        logits, covmat = self.model(x, training=False)
+        loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        return loss, tf.reduce_mean(tf.linalg.diag_part(covmat))
+
+    def _sample_valid_logits(self, x):
+        runs = self.n_samples_valid
+        logits_dist = self.model(x, training=False)
+        return tf.reshape(logits_dist.sample(runs), (runs, -1))
+
+    def _valid_vi_step(self, x, y_event, riskset):
+        logits_cpd = self._sample_valid_logits(x)
+        logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
+        cox_loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_mean)
+        self.train_loss_metric.update_state(cox_loss)
+        loss = cox_loss + tf.reduce_mean(self.model.losses) # CoxPHLoss + KL-divergence
+        return loss, tf.reduce_mean(tf.math.reduce_variance(logits_cpd, axis=0))
+
+    def _valid_mcd_step(self, x, y_event, riskset):
+        logits_cpd = self._sample_valid_logits(x)
+        logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
+        loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_mean)
+        return loss, tf.reduce_mean(tf.math.reduce_variance(logits_cpd, axis=0))
+
+    def _test_mlp_step(self, x, y_event, riskset):
+        logits = self.model(x, training=False)
+        loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        return loss, tf.constant(0, dtype=tf.float32) # zero variance for MLP
+
+    def _test_sngp_step(self, x, y_event, riskset):
+        logits, covmat = self.model(x, training=False)
+        loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits)
+        return loss, tf.reduce_mean(tf.linalg.diag_part(covmat))
+
+    def _test_sample_step(self, x, y_event, riskset):
+        logits_cpd = self._sample_test_logits(x)
+        if isinstance(self.loss_fn, CoxPHLoss):
+            logits_mean = tf.expand_dims(tf.reduce_mean(logits_cpd, axis=0), axis=1)
+            loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_mean)
+        else:
+            loss = self.loss_fn(y_true=[y_event, riskset], y_pred=logits_cpd)
+        return loss, tf.reduce_mean(tf.math.reduce_variance(logits_cpd, axis=0))
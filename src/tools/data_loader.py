@@ -25,15 +25,6 @@ class BaseDataLoader(ABC):
     def load_data(self) -> None:
         """Loads the data from a data set at startup"""
 
-    def make_time_event_split(self, y_train, y_valid, y_test) -> None:
-        t_train = np.array(y_train['Time'])
-        t_valid = np.array(y_valid['Time'])
-        t_test = np.array(y_test['Time'])
-        e_train = np.array(y_train['Event'])
-        e_valid = np.array(y_valid['Event'])
-        e_test = np.array(y_test['Event'])
-        return t_train, t_valid, t_test, e_train, e_valid, e_test
-
     def get_data(self) -> pd.DataFrame:
         """
         This method returns the features and targets
@@ -44,10 +35,10 @@ class BaseDataLoader(ABC):
         df['event'] = self.y['event']
         return df
 
-    def get_features(self) -> List[str]:
+    def get_features(self) -> Tuple[List[str], List[str]]:
         """
         This method returns the names of numerical and categorial features
-        :return: the columns of X as a list
+        :return: the numerical and categorical feature names found in load_data
         """
         return self.num_features, self.cat_features
 
@@ -79,9 +70,9 @@ class BaseDataLoader(ABC):
         X_valid = transformer.transform(X_valid)
         X_test = transformer.transform(X_test)
 
-        X_train = np.array(X_train, dtype=np.float32)
-        X_valid = np.array(X_valid, dtype=np.float32)
-        X_test = np.array(X_test, dtype=np.float32)
+        X_train = X_train.to_numpy(dtype=np.float32)
+        X_valid = X_valid.to_numpy(dtype=np.float32)
+        X_test = X_test.to_numpy(dtype=np.float32)
 
         return X_train, X_valid, X_test, y_train, y_valid, y_test
 
@@ -285,4 +276,14 @@ class MetabricDataLoader(BaseDataLoader):
         self.X = pd.DataFrame(data[num_feats], dtype=np.float64)
         self.y = convert_to_structured(outcomes['time'], outcomes['event'])
 
-        return self
\ No newline at end of file
+        return self
+
+LOADERS = {"FLCHAIN": FlchainDataLoader,
+           "SEER": SeerDataLoader,
+           "GBSG2": GbsgDataLoader,
+           "METABRIC": MetabricDataLoader,
+           "SUPPORT": SupportDataLoader,
+           "WHAS500": WhasDataLoader,
+           "WHAS500SMALL": WhasDataLoader,
+           "AIDS": AidsDataLoader,
+           "MIMIC": MimicDataLoader}
@@ -28,6 +28,7 @@ from utility.survival import convert_to_structured
 from utility.training import make_stratified_split, scale_data
 from pycox.evaluation import EvalSurv
 from utility.survival import make_time_bins
+from functools import lru_cache
 
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -52,38 +53,12 @@ def main():
     sweep_id = wandb.sweep(sweep_config, project=PROJECT_NAME)
     wandb.agent(sweep_id, train_model, count=N_RUNS)
 
-def train_model():
-    config_defaults = cfg.MLP_DEFAULT_PARAMS
-
-    # Initialize a new wandb run
-    wandb.init(config=config_defaults, group=dataset_name)
-    config = wandb.config
-    num_epochs = config['num_epochs']
-    batch_size = config['batch_size']
-    early_stop = config['early_stop']
-    patience = config['patience']
-    l2_reg = config['l2_reg']
-    n_samples_train = config['n_samples_train']
-    n_samples_valid = config['n_samples_valid']
-    n_samples_test = config['n_samples_test']
-
-    # Load data
-    if dataset_name == "SUPPORT":
-        dl = data_loader.SupportDataLoader().load_data()
-    elif dataset_name == "GBSG2":
-        dl = data_loader.GbsgDataLoader().load_data()
-    elif dataset_name == "WHAS500":
-        dl = data_loader.WhasDataLoader().load_data()
-    elif dataset_name == "FLCHAIN":
-        dl = data_loader.FlchainDataLoader().load_data()
-    elif dataset_name == "METABRIC":
-        dl = data_loader.MetabricDataLoader().load_data()
-    elif dataset_name == "SEER":
-        dl = data_loader.SeerDataLoader().load_data()
-    elif dataset_name == "MIMIC":
-        dl = data_loader.MimicDataLoader().load_data()
-    else:
+@lru_cache(maxsize=None)
+def load_data(dataset_name):
+    # The split and scaling do not depend on the sweep config, so only prepare them once
+    if dataset_name not in data_loader.LOADERS:
         raise ValueError("Dataset not found")
+    dl = data_loader.LOADERS[dataset_name]().load_data()
 
     num_features, cat_features = dl.get_features()
     df = dl.get_data()
@@ -102,8 +77,8 @@ def train_model():
     X_train, X_valid, X_test = scale_data(X_train, X_valid, X_test, cat_features, num_features)
     
     # Convert to array
-    X_train = np.array(X_train)
-    X_valid = np.array(X_valid)
+    X_train = X_train.to_numpy()
+    X_valid = X_valid.to_numpy()
 
     # Make time/event split
     t_train, e_train = split_time_event(y_train)
@@ -112,12 +87,32 @@ def train_model():
     # Calculate event times
     time_bins = make_time_bins(t_train, event=e_train)
     
+    return X_train, X_valid, t_train, e_train, t_valid, e_valid, time_bins
+
+def train_model():
+    config_defaults = cfg.MLP_DEFAULT_PARAMS
+
+    # Initialize a new wandb run
+    wandb.init(config=config_defaults, group=dataset_name)
+    config = wandb.config
+    num_epochs = config['num_epochs']
+    batch_size = config['batch_size']
+    early_stop = config['early_stop']
+    patience = config['patience']
+    l2_reg = config['l2_reg']
+    n_samples_train = config['n_samples_train']
+    n_samples_valid = config['n_samples_valid']
+    n_samples_test = config['n_samples_test']
+
+    # Load data
+    X_train, X_valid, t_train, e_train, t_valid, e_valid, time_bins = load_data(dataset_name)
+    
     # Make datasets
     train_ds = InputFunction(X_train, t_train, e_train, batch_size=batch_size,
                              drop_last=True, shuffle=True)()
     valid_ds = InputFunction(X_valid, t_valid, e_valid, batch_size=batch_size)()
     
-    model_name = "MLP"
+    model_name = "mlp"
     model = make_mlp_model(input_shape=X_train.shape[1:],
                            output_dim=1,
                            layers=config['network_layers'],
@@ -147,11 +142,11 @@ def train_model():
 
     # Compute survival function
     surv_preds = pd.DataFrame(compute_deterministic_survival_curve(
-        model, X_train, X_valid, e_train, t_train, time_bins, model_name), columns=time_bins.numpy())
+        model, X_train, X_valid, e_train, t_train, time_bins, model_name).T, index=time_bins.numpy())
     
     # Compute CI
     try:
-        ev = EvalSurv(surv_preds.T, t_valid, e_valid, censor_surv="km")
+        ev = EvalSurv(surv_preds, t_valid, e_valid)
         ci = ev.concordance_td()
     except:
         ci = np.nan
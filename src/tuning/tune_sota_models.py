@@ -6,18 +6,28 @@ from tools import data_loader
 import pandas as pd
 from utility.training import split_time_event
 import config as cfg
-from utility.survival import make_time_bins, calculate_event_times, compute_deterministic_survival_curve
+import paths as pt
+from pathlib import Path
+from utility.survival import make_time_bins, calculate_event_times
+from utility.survival import evaluate_survival_functions, evaluate_survival_array
 from tools.sota_builder import make_cox_model, make_coxnet_model, make_coxboost_model
 from tools.sota_builder import make_rsf_model, make_dsm_model, make_dcm_model, make_dcph_model
 from tools.sota_builder import make_baycox_model, make_baymtlr_model
-from tools.bnn_isd_trainer import train_bnn_model
-from utility.bnn_isd_models import make_ensemble_cox_prediction, make_ensemble_mtlr_prediction
-from utility.training import make_stratified_split, scale_data
+from utility.training import make_stratified_split, fit_transformer
 from utility.survival import convert_to_structured
 from tools.Evaluations.util import make_monotonic
 from pycox.evaluation import EvalSurv
 import torch
 from utility.survival import make_time_bins
+from functools import lru_cache
+import hashlib
+import inspect
+from contextlib import nullcontext
+from typing import NamedTuple, Callable
+from multiprocessing import get_context
+import joblib
+import pyarrow as pa
+from threadpoolctl import threadpool_limits
 
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -32,11 +42,14 @@ os.environ["WANDB_SILENT"] = "true"
 import wandb
 
 N_RUNS = 10
+CACHE_VERSION = 1 # bump to drop every on-disk copy of the loaded datasets
 PROJECT_NAME = "baysurv_bo"
 
-# Setup device
-device = "cpu" # use CPU
-device = torch.device(device)
+@lru_cache(maxsize=None)
+def get_device():
+    # Setup device
+    device = "cpu" # use CPU
+    return torch.device(device)
 
 def main():
     global model_name
@@ -49,97 +62,156 @@ def main():
     parser.add_argument('--model', type=str,
                         required=True,
                         default=None)
+    parser.add_argument('--parallel', type=int,
+                        required=False,
+                        default=1)
     args = parser.parse_args()
     
     if args.dataset:
         dataset_name = args.dataset
     if args.model:
         model_name = args.model
-        
-    if model_name == "cox":
-        sweep_config = get_cox_sweep_config()
-    elif model_name == "coxboost":
-        sweep_config = get_coxboost_sweep_config()
-    elif model_name == "coxnet":
-        sweep_config = get_coxnet_sweep_config()
-    elif model_name == "dcph":
-        sweep_config = get_dcph_sweep_config()
-    elif model_name == "dcm":
-        sweep_config = get_dcm_sweep_config()
-    elif model_name == "dsm":
-        sweep_config = get_dsm_sweep_config()
-    elif model_name == "rsf":
-        sweep_config = get_rsf_sweep_config()
-    elif model_name == "baycox":
-        sweep_config = get_baycox_sweep_config()
-    elif model_name == "baymtlr":
-        sweep_config = get_baymtlr_sweep_config()
-    else:
+    
+    if model_name not in MODEL_REGISTRY:
         raise ValueError("Model not found")
+    sweep_config = MODEL_REGISTRY[model_name].sweep()
     
-    sweep_id = wandb.sweep(sweep_config, project=f'{PROJECT_NAME}_{model_name}')
-    wandb.agent(sweep_id, train_model, count=N_RUNS)
-
-def train_model():
-# Make and train mdoel
-    if model_name == "cox":
-        config_defaults = cfg.COX_DEFAULT_PARAMS
-    elif model_name == "coxboost":
-        config_defaults = cfg.COXBOOST_DEFAULT_PARAMS
-    elif model_name == "coxnet":
-        config_defaults = cfg.COXNET_DEFAULT_PARAMS
-    elif model_name == "dcm":
-        config_defaults = cfg.DCM_DEFAULT_PARAMS
-    elif model_name == "dcph":
-        config_defaults = cfg.DCPH_DEFAULT_PARAMS
-    elif model_name == "dsm":
-        config_defaults = cfg.DSM_DEFAULT_PARAMS
-    elif model_name == "rsf":
-        config_defaults = cfg.RSF_DEFAULT_PARAMS
-    elif model_name == "baycox":
-        config_defaults = cfg.BAYCOX_DEFAULT_PARAMS
-    elif model_name == "baymtlr":
-        config_defaults = cfg.BAYMTLR_DEFAULT_PARAMS
+    project = f'{PROJECT_NAME}_{model_name}'
+    sweep_id = wandb.sweep(sweep_config, project=project)
+    if args.parallel > 1:
+        run_parallel_agents(sweep_id, project, args.parallel)
     else:
-        raise ValueError("Model not found")
+        wandb.agent(sweep_id, train_model, count=N_RUNS)
 
-    # Initialize a new wandb run
-    wandb.init(config=config_defaults, group=dataset_name)
-    config = wandb.config
+def run_agent(sweep_id, project, dataset, model, count, n_agents, n_threads):
+    # Spawned workers do not run main(), so set the globals train_model reads
+    global model_name
+    global dataset_name
+    dataset_name, model_name = dataset, model
+    # Limit the threads of this worker only, so the agents do not oversubscribe the CPU.
+    # torch and BLAS are already loaded by the module import, so set their pools directly as well
+    os.environ["PARALLEL_AGENTS"] = str(n_agents)
+    os.environ["OMP_NUM_THREADS"] = str(n_threads)
+    os.environ["MKL_NUM_THREADS"] = str(n_threads)
+    torch.set_num_threads(n_threads)
+    threadpool_limits(limits=n_threads)
+    wandb.agent(sweep_id, train_model, count=count, project=project)
 
-    # Load data
-    if dataset_name == "SUPPORT":
-        dl = data_loader.SupportDataLoader().load_data()
-    elif dataset_name == "GBSG2":
-        dl = data_loader.GbsgDataLoader().load_data()
-    elif dataset_name == "WHAS500":
-        dl = data_loader.WhasDataLoader().load_data()
-    elif dataset_name == "FLCHAIN":
-        dl = data_loader.FlchainDataLoader().load_data()
-    elif dataset_name == "METABRIC":
-        dl = data_loader.MetabricDataLoader().load_data()
-    elif dataset_name == "SEER":
-        dl = data_loader.SeerDataLoader().load_data()
-    elif dataset_name == "MIMIC":
-        dl = data_loader.MimicDataLoader().load_data()
-    else:
+def run_parallel_agents(sweep_id, project, n_workers):
+    # Split the runs over several agents on the same sweep
+    n_threads = max(1, os.cpu_count() // n_workers)
+    ctx = get_context("spawn")
+    workers = []
+    for worker_id in range(n_workers):
+        count = N_RUNS // n_workers + int(worker_id < N_RUNS % n_workers)
+        if count == 0:
+            continue
+        worker = ctx.Process(target=run_agent,
+                             args=(sweep_id, project, dataset_name, model_name, count, n_workers, n_threads))
+        worker.start()
+        workers.append(worker)
+    for worker in workers:
+        worker.join()
+    failed = [worker.exitcode for worker in workers if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"{len(failed)} sweep agent(s) failed with exit codes {failed}")
+
+class SweepData(NamedTuple):
+    X_train: pd.DataFrame
+    X_valid: pd.DataFrame
+    y_train: np.ndarray
+    y_valid: np.ndarray
+    y_train_df: pd.DataFrame
+    y_valid_df: pd.DataFrame
+    t_train: np.ndarray
+    e_train: np.ndarray
+    t_valid: np.ndarray
+    e_valid: np.ndarray
+    time_bins: torch.Tensor
+    time_bins_arr: np.ndarray
+    time_bins_list: list
+    mtlr_times_arr: np.ndarray
+    data_train: pd.DataFrame
+    data_valid: pd.DataFrame
+    bnn_X_valid: torch.Tensor
+
+def make_bnn_frame(X, y):
+    # Build the features, time and event columns from one contiguous buffer
+    arr = np.concatenate([np.asarray(X, dtype=np.float32), y['time'].astype(np.float32)[:, np.newaxis],
+                          y['event'].astype(np.float32)[:, np.newaxis]], axis=1)
+    return pd.DataFrame(arr, columns=list(X.columns) + ["time", "event"])
+
+def dataset_cache_key(dataset_name):
+    # Editing the loader's module or bumping CACHE_VERSION gives a new key, so stale copies are never read
+    loader_source = inspect.getsource(inspect.getmodule(data_loader.LOADERS[dataset_name]))
+    digest = hashlib.sha1(f"{CACHE_VERSION}:{loader_source}".encode()).hexdigest()[:12]
+    return f"{dataset_name}_{digest}"
+
+def load_dataset(dataset_name):
+    # Keep the loaded dataset on disk, so later agents skip parsing the raw files
+    if dataset_name not in data_loader.LOADERS:
         raise ValueError("Dataset not found")
+    cache_key = dataset_cache_key(dataset_name)
+    X_path = Path.joinpath(pt.CACHE_DIR, f"{cache_key}.parquet")
+    y_path = Path.joinpath(pt.CACHE_DIR, f"{cache_key}.npz")
+    if X_path.exists() and y_path.exists():
+        X = pd.read_parquet(X_path)
+        with np.load(y_path) as cached:
+            y = cached["y"]
+            num_features = cached["num_features"].tolist()
+            cat_features = cached["cat_features"].tolist()
+    else:
+        dl = data_loader.LOADERS[dataset_name]().load_data()
+        X, y = pd.DataFrame(dl.X), dl.y
+        num_features, cat_features = dl.get_features()
+        # Write to temporary files and rename, so parallel agents never read a partial cache
+        pt.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        X_tmp = X_path.with_name(f"{X_path.name}.{os.getpid()}.tmp")
+        y_tmp = y_path.with_name(f"{y_path.name}.{os.getpid()}.tmp")
+        X.to_parquet(X_tmp)
+        with open(y_tmp, "wb") as f:
+            np.savez_compressed(f, y=y, num_features=np.array(num_features, dtype=str),
+                                cat_features=np.array(cat_features, dtype=str))
+        os.replace(X_tmp, X_path)
+        os.replace(y_tmp, y_path)
+    df = X.copy()
+    df['time'] = y['time']
+    df['event'] = y['event']
+    return df, num_features, cat_features
 
-    num_features, cat_features = dl.get_features()
-    df = dl.get_data()
+def make_outcome_frame(y):
+    # Go through Arrow so each column is handed to pandas without a BlockManager consolidation copy
+    table = pa.table({"time": pa.array(np.ascontiguousarray(y["time"])),
+                      "event": pa.array(y["event"].astype(bool))})
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+@lru_cache(maxsize=None)
+def load_data(dataset_name) -> SweepData:
+    # None of this depends on the sweep config, so only prepare it once per process
+    df, num_features, cat_features = load_dataset(dataset_name)
     
     # Split data
     df_train, df_valid, df_test = make_stratified_split(df, stratify_colname='both', frac_train=0.7,
                                                         frac_valid=0.1, frac_test=0.2, random_state=0)
     X_train = df_train[cat_features+num_features]
     X_valid = df_valid[cat_features+num_features]
-    X_test = df_test[cat_features+num_features]
     y_train = convert_to_structured(df_train["time"], df_train["event"])
     y_valid = convert_to_structured(df_valid["time"], df_valid["event"])
-    y_test = convert_to_structured(df_test["time"], df_test["event"])
     
     # Scale data
-    X_train, X_valid, X_test = scale_data(X_train, X_valid, X_test, cat_features, num_features)
+    transformer = fit_transformer(X_train, cat_features, num_features,
+                                  cat_feat_strat='mode', num_feat_strat='mean', one_hot=True, fill_value=-1)
+    X_train = transformer.transform(X_train)
+    X_valid = transformer.transform(X_valid)
+    
+    # Keep the features as float32 C-contiguous buffers, framed without a copy for the auton models
+    feature_names = list(X_train.columns)
+    X_train = pd.DataFrame(np.ascontiguousarray(X_train, dtype=np.float32), columns=feature_names)
+    X_valid = pd.DataFrame(np.ascontiguousarray(X_valid, dtype=np.float32), columns=feature_names)
+    
+    # Make outcome frames for the auton models
+    y_train_df = make_outcome_frame(y_train)
+    y_valid_df = make_outcome_frame(y_valid)
     
     # Make time/event split
     t_train, e_train = split_time_event(y_train)
@@ -147,104 +219,44 @@ def train_model():
 
     # Make event times
     time_bins = make_time_bins(t_train, event=e_train)
+    time_bins_arr = time_bins.numpy()
+    time_bins_list = time_bins_arr.tolist()
+    mtlr_times_arr = np.concatenate([[0], time_bins_arr]) # MTLR curves start at time zero
+    time_bins = time_bins.to(get_device())
+    
+    # Make data frames and validation tensor for the BNN models
+    data_train = make_bnn_frame(X_train, y_train)
+    data_valid = make_bnn_frame(X_valid, y_valid)
+    bnn_X_valid = torch.from_numpy(np.ascontiguousarray(X_valid))
+    if get_device().type == "cuda":
+        bnn_X_valid = bnn_X_valid.pin_memory()
+    
+    return SweepData(X_train, X_valid, y_train, y_valid, y_train_df, y_valid_df,
+                     t_train, e_train, t_valid, e_valid,
+                     time_bins, time_bins_arr, time_bins_list, mtlr_times_arr,
+                     data_train, data_valid, bnn_X_valid)
+
+def train_model():
+    spec = MODEL_REGISTRY[model_name]
+
+    # Initialize a new wandb run
+    wandb.init(config=spec.defaults, group=dataset_name)
+    config = wandb.config
+
+    data = load_data(dataset_name)
     
     # Make and train mdoel
-    if model_name == "cox":
-        model = make_cox_model(config)
-        model.fit(X_train, y_train)
-    elif model_name == "coxboost":
-        model = make_coxboost_model(config)
-        model.fit(X_train, y_train)
-    elif model_name == "coxnet":
-        model = make_coxnet_model(config)
-        model.fit(X_train, y_train)
-    elif model_name == "dcph":
-        model = make_dcph_model(config)
-        model.fit(X_train, pd.DataFrame(y_train),
-                  val_data=(X_valid, pd.DataFrame(y_valid)))
-    elif model_name == "dcm":
-        model = make_dcm_model(config)
-        model.fit(X_train, pd.DataFrame(y_train),
-                  val_data=(X_valid, pd.DataFrame(y_valid)))
-    elif model_name == "dsm":
-        model = make_dsm_model(config)
-        model.fit(X_train, pd.DataFrame(y_train),
-                  val_data=(X_valid, pd.DataFrame(y_valid)))
-    elif model_name == "rsf":
-        model = make_rsf_model(config)
-        model.fit(X_train, y_train)
-    elif model_name == "baycox":
-        data_train = X_train.copy()
-        data_train["time"] = pd.Series(y_train['time'])
-        data_train["event"] = pd.Series(y_train['event']).astype(int)
-        data_valid = X_valid.copy()
-        data_valid["time"] = pd.Series(y_valid['time'])
-        data_valid["event"] = pd.Series(y_valid['event']).astype(int)
-        num_features = X_train.shape[1]
-        model = make_baycox_model(num_features, config)
-        model = train_bnn_model(model, data_train, data_valid, mtlr_times,
-                                config=config, random_state=0, reset_model=True, device=device)
-    elif model_name == "baymtlr":
-        data_train = X_train.copy()
-        data_train["time"] = pd.Series(y_train['time'])
-        data_train["event"] = pd.Series(y_train['event']).astype(int)
-        data_valid = X_valid.copy()
-        data_valid["time"] = pd.Series(y_valid['time'])
-        data_valid["event"] = pd.Series(y_valid['event']).astype(int)
-        num_features = X_train.shape[1]
-        model = make_baymtlr_model(num_features, mtlr_times, config)
-        model = train_bnn_model(model, data_train, data_valid,
-                                mtlr_times, config=config,
-                                random_state=0, reset_model=True, device=device)
-    else:
-        raise ValueError("Model not found")
+    model = spec.build(data, config)
+    model = spec.fit(model, data, config)
     
     # Compute survival function
-    if model_name == "dsm":
-        surv_preds = pd.DataFrame(model.predict_survival(X_valid, times=list(time_bins)), columns=time_bins.numpy())
-    elif model_name == "dcph":
-        surv_preds = pd.DataFrame(model.predict_survival(X_valid, times=list(time_bins)), columns=time_bins.numpy())
-    elif model_name == "dcm":
-        surv_preds = pd.DataFrame(model.predict_survival(X_valid, times=list(time_bins)), columns=time_bins.numpy())
-    elif model_name == "cox":
-        test_surv_fn = model.predict_survival_function(X_valid)
-        surv_preds = np.row_stack([fn(time_bins) for fn in test_surv_fn])
-    elif model_name == "coxnet":
-        test_surv_fn = model.predict_survival_function(X_valid)
-        surv_preds = np.row_stack([fn(time_bins) for fn in test_surv_fn])
-    elif model_name == "rsf":
-        test_surv_fn = model.predict_survival_function(X_valid)
-        surv_preds = np.row_stack([fn(time_bins) for fn in test_surv_fn])
-    elif model_name == "coxboost":
-        test_surv_fn = model.predict_survival_function(X_valid)
-        surv_preds = np.row_stack([fn(time_bins) for fn in test_surv_fn])
-    elif model_name == "baycox":
-        baycox_valid_data = torch.tensor(data_valid.drop(["time", "event"], axis=1).values,
-                                        dtype=torch.float, device=device)
-        survival_outputs, _, ensemble_outputs = make_ensemble_cox_prediction(model, baycox_valid_data, config)
-        surv_preds = survival_outputs.numpy()
-    elif model_name == "baymtlr":
-        baycox_valid_data = torch.tensor(data_valid.drop(["time", "event"], axis=1).values,
-                                        dtype=torch.float, device=device)
-        survival_outputs, _, ensemble_outputs = make_ensemble_mtlr_prediction(model, baycox_valid_data, mtlr_times, config)
-        surv_preds = survival_outputs.numpy()
-    else:
-        surv_preds = compute_deterministic_survival_curve(model, np.array(X_train), np.array(X_valid),
-                                                          e_train, t_train, time_bins, model_name)
-        
-    # Make DCM monotonic
-    if model_name == "dcm":
-        surv_preds = make_monotonic(surv_preds.to_numpy(), time_bins, method='ceil')
-        
-    # Convert to DataFrame
-    if model_name == "baymtlr":
-        mtlr_times = torch.cat([torch.tensor([0]).to(mtlr_times.device), mtlr_times], 0)
-        surv_preds = pd.DataFrame(surv_preds, columns=mtlr_times.numpy())
-    else:
-        surv_preds = pd.DataFrame(surv_preds, dtype=np.float64, columns=time_bins.numpy())
+    surv_preds, times = spec.predict(model, data, config)
+    
+    # Convert to DataFrame, laid out times x samples as EvalSurv expects
+    surv_preds = pd.DataFrame(surv_preds.T, dtype=np.float64, index=times)
     
     try:
-        ev = EvalSurv(surv_preds.T, t_valid, e_valid, censor_surv="km")
+        ev = EvalSurv(surv_preds, data.t_valid, data.e_valid)
         ci = ev.concordance_td()
     except:
         ci = np.nan
@@ -252,7 +264,103 @@ def train_model():
     # Log to wandb
     wandb.log({"val_ci": ci})
 
-if __name__ == "__main__":
-    main()
+def _agent_cores():
+    n_agents = int(os.environ.get("PARALLEL_AGENTS", 1))
+    return n_agents, max(1, os.cpu_count() // n_agents)
+
+def _fit_sksurv(model, data, config):
+    # Only cap BLAS when other agents share the machine, so one agent cannot take their cores
+    n_agents, n_cores = _agent_cores()
+    limits = threadpool_limits(limits=n_cores, user_api="blas") if n_agents > 1 else nullcontext()
+    with limits:
+        model.fit(data.X_train, data.y_train)
+    return model
+
+def _fit_rsf(model, data, config):
+    # RSF grows its trees through joblib with n_jobs=None, so it picks up this agent's share of the cores
+    _, n_cores = _agent_cores()
+    with joblib.parallel_backend("threading", n_jobs=n_cores):
+        return _fit_sksurv(model, data, config)
+
+def _fit_auton(model, data, config):
+    model.fit(data.X_train, data.y_train_df,
+              val_data=(data.X_valid, data.y_valid_df))
+    return model
 
+def _fit_bnn(model, data, config):
+    from tools.bnn_isd_trainer import train_bnn_model
+    return train_bnn_model(model, data.data_train, data.data_valid, data.time_bins,
+                           config=config, random_state=0, reset_model=True, device=get_device())
 
+def _predict_sksurv(model, data, config):
+    test_surv_fn = model.predict_survival_function(data.X_valid)
+    return evaluate_survival_functions(test_surv_fn, data.time_bins_arr), data.time_bins_arr
+
+def _predict_sksurv_array(model, data, config):
+    # RSF and CoxBoost can return their curves on unique_times_ as one array
+    surv = model.predict_survival_function(data.X_valid, return_array=True)
+    return evaluate_survival_array(surv, model.unique_times_, data.time_bins_arr), data.time_bins_arr
+
+def _predict_auton(model, data, config):
+    surv_preds = model.predict_survival(data.X_valid, times=data.time_bins_list)
+    return surv_preds, data.time_bins_arr
+
+def _predict_dcm(model, data, config):
+    surv_preds, times = _predict_auton(model, data, config)
+    return make_monotonic(surv_preds, data.time_bins_arr, method='ceil'), times
+
+def _bnn_autocast(config):
+    # Reduced precision only pays off on the GPU, so autocast stays off on the CPU
+    device = get_device()
+    dtype = getattr(torch, config.get("inference_dtype", "float32"))
+    if device.type != "cuda" or dtype == torch.float32:
+        return nullcontext()
+    return torch.autocast(device_type=device.type, dtype=dtype)
+
+def _predict_baycox(model, data, config):
+    from utility.bnn_isd_models import make_ensemble_cox_prediction
+    model.eval()
+    with torch.inference_mode(), _bnn_autocast(config):
+        survival_outputs, _, _ = make_ensemble_cox_prediction(model, data.bnn_X_valid.to(get_device(), non_blocking=True), config)
+    return survival_outputs.float().cpu().numpy(), data.time_bins_arr
+
+def _predict_baymtlr(model, data, config):
+    from utility.bnn_isd_models import make_ensemble_mtlr_prediction
+    model.eval()
+    with torch.inference_mode(), _bnn_autocast(config):
+        survival_outputs, _, _ = make_ensemble_mtlr_prediction(model, data.bnn_X_valid.to(get_device(), non_blocking=True),
+                                                              data.time_bins, config)
+    return survival_outputs.float().cpu().numpy(), data.mtlr_times_arr
+
+class ModelSpec(NamedTuple):
+    sweep: Callable
+    defaults: dict
+    build: Callable
+    fit: Callable
+    predict: Callable
+
+MODEL_REGISTRY = {
+    "cox": ModelSpec(get_cox_sweep_config, cfg.COX_DEFAULT_PARAMS,
+                     lambda data, config: make_cox_model(config), _fit_sksurv, _predict_sksurv),
+    "coxboost": ModelSpec(get_coxboost_sweep_config, cfg.COXBOOST_DEFAULT_PARAMS,
+                          lambda data, config: make_coxboost_model(config), _fit_sksurv, _predict_sksurv_array),
+    "coxnet": ModelSpec(get_coxnet_sweep_config, cfg.COXNET_DEFAULT_PARAMS,
+                        lambda data, config: make_coxnet_model(config), _fit_sksurv, _predict_sksurv),
+    "rsf": ModelSpec(get_rsf_sweep_config, cfg.RSF_DEFAULT_PARAMS,
+                     lambda data, config: make_rsf_model(config), _fit_rsf, _predict_sksurv_array),
+    "dcph": ModelSpec(get_dcph_sweep_config, cfg.DCPH_DEFAULT_PARAMS,
+                      lambda data, config: make_dcph_model(config), _fit_auton, _predict_auton),
+    "dcm": ModelSpec(get_dcm_sweep_config, cfg.DCM_DEFAULT_PARAMS,
+                     lambda data, config: make_dcm_model(config), _fit_auton, _predict_dcm),
+    "dsm": ModelSpec(get_dsm_sweep_config, cfg.DSM_DEFAULT_PARAMS,
+                     lambda data, config: make_dsm_model(config), _fit_auton, _predict_auton),
+    "baycox": ModelSpec(get_baycox_sweep_config, cfg.BAYCOX_DEFAULT_PARAMS,
+                        lambda data, config: make_baycox_model(data.X_train.shape[1], config),
+                        _fit_bnn, _predict_baycox),
+    "baymtlr": ModelSpec(get_baymtlr_sweep_config, cfg.BAYMTLR_DEFAULT_PARAMS,
+                         lambda data, config: make_baymtlr_model(data.X_train.shape[1], data.time_bins, config),
+                         _fit_bnn, _predict_baymtlr),
+}
+
+if __name__ == "__main__":
+    main()
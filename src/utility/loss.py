@@ -77,6 +77,7 @@ class CoxPHLoss(tf.keras.losses.Loss):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    @tf.function(jit_compile=True)
     def call(self,
              y_true: Sequence[tf.Tensor],
              y_pred: tf.Tensor) -> tf.Tensor:
@@ -6,6 +6,7 @@ from sksurv.metrics import concordance_index_censored, concordance_index_ipcw
 from sksurv.metrics import integrated_brier_score
 from utility.survival import convert_to_structured
 from utility.survival import compute_survival_times
+from utility.survival import evaluate_survival_functions
 from sksurv.linear_model.coxph import BreslowEstimator
 import pandas as pd
 from pycox.evaluation import EvalSurv
@@ -63,7 +64,7 @@ class IbsMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_train'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = np.row_stack([fn(self._event_times) for fn in test_surv_fn])
+            surv_preds = evaluate_survival_functions(test_surv_fn, self._event_times)
             surv_test = pd.DataFrame(surv_preds, columns=self._event_times)
             ev = EvalSurv(surv_test.T, data["y_train"]["time"], data["y_train"]["event"], censor_surv="km")
             ibs = ev.integrated_brier_score(self._event_times)
@@ -72,7 +73,7 @@ class IbsMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_test'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = np.row_stack([fn(self._event_times) for fn in test_surv_fn])
+            surv_preds = evaluate_survival_functions(test_surv_fn, self._event_times)
             surv_test = pd.DataFrame(surv_preds, columns=self._event_times)
             ev = EvalSurv(surv_test.T, data["y_test"]["time"], data["y_test"]["event"], censor_surv="km")
             ibs = ev.integrated_brier_score(self._event_times)
@@ -130,7 +131,7 @@ class CiMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_train'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             ev = EvalSurv(surv_preds.T, t_train, e_train, censor_surv="km")
             ctd = ev.concordance_td()
@@ -139,7 +140,7 @@ class CiMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_test'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             t_test = data["y_test"]['time']
             e_test = data["y_test"]['event']
@@ -199,7 +200,7 @@ class InbllMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_train'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             ev = EvalSurv(surv_preds.T, t_train, e_train, censor_surv="km")
             inbll = ev.integrated_nbll(self._event_times)
@@ -208,7 +209,7 @@ class InbllMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_test'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             t_test = data["y_test"]['time']
             e_test = data["y_test"]['event']
@@ -269,7 +270,7 @@ class IciMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_train'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             surv_test = pd.DataFrame(surv_preds, columns=self._event_times)
             deltas = dict()
@@ -281,7 +282,7 @@ class IciMetric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_test'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             t_test = data["y_test"]['time']
             e_test = data["y_test"]['event']
@@ -347,7 +348,7 @@ class E50Metric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_train'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             surv_test = pd.DataFrame(surv_preds, columns=self._event_times)
             deltas = dict()
@@ -359,7 +360,7 @@ class E50Metric:
             breslow = BreslowEstimator().fit(train_predictions, e_train, t_train)
             test_predictions = data['pred_test'].reshape(-1)
             test_surv_fn = breslow.get_survival_function(test_predictions)
-            surv_preds = pd.DataFrame(np.row_stack([fn(self._event_times) for fn in test_surv_fn]),
+            surv_preds = pd.DataFrame(evaluate_survival_functions(test_surv_fn, self._event_times),
                                       columns=self._event_times)
             t_test = data["y_test"]['time']
             e_test = data["y_test"]['event']
@@ -401,9 +402,9 @@ class CindexMetric:
         y_pred : tf.Tensor
             Tensor containing predicted risk score for one batch.
         """
-        self._data["label_time"].append(y_true["label_time"].numpy())
-        self._data["label_event"].append(y_true["label_event"].numpy())
-        self._data["prediction"].append(tf.squeeze(y_pred).numpy())
+        self._data["label_time"].append(tf.reshape(y_true["label_time"], [-1]))
+        self._data["label_event"].append(tf.reshape(y_true["label_event"], [-1]))
+        self._data["prediction"].append(tf.reshape(y_pred, [-1]))
 
     def result(self) -> Dict[str, float]:
         """Computes the concordance index across collected values.
@@ -415,7 +416,7 @@ class CindexMetric:
         """
         data = {}
         for k, v in self._data.items():
-            data[k] = np.concatenate(v)
+            data[k] = tf.concat(v, axis=0).numpy() # single host copy per epoch
 
         results = concordance_index_censored(
             data["label_event"] == 1,
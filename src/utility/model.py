@@ -12,36 +12,25 @@ import joblib
 curr_dir = os.getcwd()
 root_dir = Path(curr_dir).absolute().parent # TODO: Fix this to properly set path
 
+MODEL_LABELS = {
+    "mlp": "Baseline (MLP)",
+    "sngp": "SNGP",
+    "vi": "VI",
+    "mcd1": "MCD " + r"($p$ = 0.1)",
+    "mcd2": "MCD " + r"($p$ = 0.2)",
+    "mcd3": "MCD " + r"($p$ = 0.5)",
+    "cox": "CoxPH",
+    "coxnet": "CoxNet",
+    "coxboost": "CoxBoost",
+    "rsf": "RSF",
+    "dsm": "DSM",
+    "dcm": "DCM",
+    "baycox": "BayCox",
+    "baymtlr": "BayMTLR"
+}
+
 def map_model_name(model_name):
-    if model_name == "mlp":
-        model_name = "Baseline (MLP)"
-    elif model_name == "sngp":
-        model_name = "SNGP"
-    elif model_name == "vi":
-        model_name = "VI"
-    elif model_name == "mcd1":
-        model_name = "MCD " + r"($p$ = 0.1)"
-    elif model_name == "mcd2":
-        model_name = "MCD " + r"($p$ = 0.2)"
-    elif model_name == "mcd3":
-        model_name = "MCD " + r"($p$ = 0.5)"
-    elif model_name == "cox":
-        model_name = "CoxPH"
-    elif model_name == "coxnet":
-        model_name = "CoxNet"
-    elif model_name == "coxboost":
-        model_name = "CoxBoost"
-    elif model_name == "rsf":
-        model_name = "RSF"
-    elif model_name == "dsm":
-        model_name = "DSM"
-    elif model_name == "dcm":
-        model_name = "DCM"
-    elif model_name == "baycox":
-        model_name = "BayCox"
-    elif model_name == "baymtlr":
-        model_name = "BayMTLR"
-    return model_name
+    return MODEL_LABELS.get(model_name, model_name)
 
 def load_sota_model(dataset_name, model_name):
     return joblib.load(Path.joinpath(pt.MODELS_DIR,
@@ -77,9 +77,11 @@ def plot_calibration_curves(percentiles, pred_obs, predictions, model_names, dat
 
 def plot_training_curves(results, dataset_name, model_names, metric_names):
     fig, axes = plt.subplots(1, 4, figsize=(18, 4))
+    dataset_results = results[results['DatasetName'] == dataset_name]
+    results_by_model = dict(tuple(dataset_results.groupby('ModelName')))
     for (j, metric_name) in enumerate(metric_names):
         for (k, model_name) in enumerate(model_names):
-            model_results = results.loc[(results['DatasetName'] == dataset_name) & (results['ModelName'] == model_name)]
+            model_results = results_by_model.get(model_name, dataset_results.iloc[:0])
             metric_results = model_results[metric_name]
             n_epochs = len(model_results)
             axes[j].plot(range(n_epochs), metric_results, label=map_model_name(model_name),
@@ -47,91 +47,41 @@ class InputFunction:
         """Number of batches for one epoch."""
         return int(np.floor(self.size() / self.batch_size))
 
-    def _get_data_batch(self, index: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    def _get_data_batch(self, data: tf.Tensor,
+                        labels: Dict[str, tf.Tensor]) -> Tuple[tf.Tensor, Dict[str, tf.Tensor]]:
         """Compute risk set for samples in batch."""
-        time = self.time[index]
-        event = self.event[index]
-        data = self.data[index]
-
-        labels = {
-            "label_event": event.astype(np.int32),
-            "label_time": time.astype(np.float32),
-            "label_riskset": _make_riskset(time)
-        }
+        labels = dict(labels)
+        labels["label_riskset"] = _make_riskset(labels["label_time"])
         return data, labels
 
-    def _iter_data(self) -> Iterable[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
-        """Generator that yields one batch at a time."""
-        index = np.arange(self.size())
-        rnd = np.random.RandomState(self.seed)
-
-        if self.shuffle:
-            rnd.shuffle(index)
-        for b in range(self.steps_per_epoch()):
-            start = b * self.batch_size
-            idx = index[start:(start + self.batch_size)]
-            yield self._get_data_batch(idx)
-
-        if not self.drop_last:
-            start = self.steps_per_epoch() * self.batch_size
-            idx = index[start:]
-            yield self._get_data_batch(idx)
-
-    def _get_shapes(self) -> Tuple[tf.TensorShape, Dict[str, tf.TensorShape]]:
-        """Return shapes of data returned by `self._iter_data`."""
-        batch_size = self.batch_size if self.drop_last else None
-        _, n_features = self.data.shape
-        rows = tf.TensorShape([batch_size, n_features])
-
-        labels = {k: tf.TensorShape((batch_size,))
-                  for k in ("label_event", "label_time")}
-        labels["label_riskset"] = tf.TensorShape((batch_size, batch_size))
-        return rows, labels
-
-    def _get_dtypes(self) -> Tuple[tf.DType, Dict[str, tf.DType]]:
-        """Return dtypes of data returned by `self._iter_data`."""
-        labels = {"label_event": tf.int32,
-                  "label_time": tf.float32,
-                  "label_riskset": tf.bool}
-        return tf.float32, labels
-
     def _make_dataset(self) -> tf.data.Dataset:
-        """Create dataset from generator."""
-        ds = tf.data.Dataset.from_generator(
-            self._iter_data,
-            self._get_dtypes(),
-            self._get_shapes()
-        )
-        return ds
+        """Create dataset from in-memory tensors."""
+        labels = {"label_event": self.event.astype(np.int32)[:, np.newaxis], # (batch, 1) as the loss expects
+                  "label_time": self.time.astype(np.float32)}
+        ds = tf.data.Dataset.from_tensor_slices((self.data.astype(np.float32), labels))
+        if self.shuffle:
+            # same order every epoch, as with the seeded index shuffle
+            ds = ds.shuffle(self.size(), seed=self.seed, reshuffle_each_iteration=False)
+        ds = ds.batch(self.batch_size, drop_remainder=self.drop_last)
+        return ds.map(self._get_data_batch, num_parallel_calls=tf.data.AUTOTUNE)
 
     def __call__(self) -> tf.data.Dataset:
         return self._make_dataset()
 
-def _make_riskset(time: np.ndarray) -> np.ndarray:
+def _make_riskset(time: tf.Tensor) -> tf.Tensor:
     """Compute mask that represents each sample's risk set.
 
     Parameters
     ----------
-    time : np.ndarray, shape=(n_samples,)
-        Observed event time sorted in descending order.
+    time : tf.Tensor, shape=(n_samples,)
+        Observed event time.
 
     Returns
     -------
-    risk_set : np.ndarray, shape=(n_samples, n_samples)
+    risk_set : tf.Tensor, shape=(n_samples, n_samples)
         Boolean matrix where the `i`-th row denotes the
         risk set of the `i`-th instance, i.e. the indices `j`
         for which the observer time `y_j >= y_i`.
     """
-    assert time.ndim == 1, "expected 1D array"
-
-    # sort in descending order
-    o = np.argsort(-time, kind="mergesort")
-    n_samples = len(time)
-    risk_set = np.zeros((n_samples, n_samples), dtype=np.bool_)
-    for i_org, i_sort in enumerate(o):
-        ti = time[i_sort]
-        k = i_org
-        while k < n_samples and ti == time[o[k]]:
-            k += 1
-        risk_set[i_sort, o[:k]] = True
-    return risk_set
\ No newline at end of file
+    # sample j is in the risk set of sample i if y_j >= y_i
+    return tf.expand_dims(time, axis=0) >= tf.expand_dims(time, axis=1)
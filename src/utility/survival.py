@@ -381,11 +381,24 @@ def convert_to_structured(T, E):
     # dtypes for conversion
     default_dtypes = {"names": ("event", "time"), "formats": ("bool", "i4")}
 
-    # concat of events and times
-    concat = list(zip(E, T))
-
-    # return structured array
-    return np.array(concat, dtype=default_dtypes)
+    # fill the structured array field by field
+    structured = np.empty(len(E), dtype=default_dtypes)
+    structured["event"] = E
+    structured["time"] = T
+    return structured
+
+def evaluate_survival_array(surv, unique_times, times):
+    """Evaluates survival curves given on a shared time grid at the given times."""
+    idx = np.clip(np.searchsorted(unique_times, np.asarray(times), side='right') - 1, 0, len(unique_times) - 1)
+    return surv[:, idx]
+
+def evaluate_survival_functions(surv_fn, times):
+    """Evaluates step functions that share the same breakpoints at the given times."""
+    x = surv_fn[0].x
+    y = np.stack([fn.y for fn in surv_fn])
+    a = np.array([fn.a for fn in surv_fn])[:, None]
+    b = np.array([fn.b for fn in surv_fn])[:, None]
+    return a * evaluate_survival_array(y, x, times) + b
 
 def compute_deterministic_survival_curve(model, X_train, X_test, e_train, t_train,
                                          event_times, model_name):
@@ -400,22 +413,22 @@ def compute_deterministic_survival_curve(model, X_train, X_test, e_train, t_trai
         test_logits = model.predict(X_test).reshape(-1)
     breslow = BreslowEstimator().fit(train_logits, e_train, t_train)
     surv_fn = breslow.get_survival_function(test_logits)
-    breslow_surv_times = np.row_stack([fn(event_times) for fn in surv_fn])
+    breslow_surv_times = evaluate_survival_functions(surv_fn, event_times)
     return breslow_surv_times
 
 def compute_nondeterministic_survival_curve(model, X_train, X_test, e_train, t_train,
                                             event_times, n_samples_train, n_samples_test):
-    train_cpd = np.zeros((n_samples_train, len(X_train)))
-    for i in range(0, n_samples_train):
-        train_logits = model.predict(X_train, verbose=False)
-        train_cpd[i,:] = np.reshape(train_logits, len(X_train))
+    # Tile the inputs so every sample is drawn in one predict call
+    train_logits = model.predict(np.tile(X_train, (n_samples_train, 1)), verbose=False)
+    train_cpd = np.reshape(train_logits, (n_samples_train, len(X_train)))
     breslow = BreslowEstimator().fit(np.mean(train_cpd, axis=0), e_train, t_train)
-    breslow_surv_times = np.zeros((n_samples_test, len(X_test), len(event_times)))
-    for i in range(0, n_samples_test):
-        test_logits = model.predict(X_test, verbose=False)
-        surv_fn = breslow.get_survival_function(np.reshape(test_logits, len(X_test)))
-        breslow_surv_times[i] = np.row_stack([fn(event_times) for fn in surv_fn])
-    return breslow_surv_times
+    test_logits = model.predict(np.tile(X_test, (n_samples_test, 1)), verbose=False)
+    # Evaluate the baseline at the event times first, so no per-row step function
+    # over all unique training times is ever built: S(t|x) = S0(t) ** exp(logit)
+    baseline = breslow.baseline_survival_
+    base = evaluate_survival_array(baseline.y[np.newaxis, :], baseline.x, event_times)[0]
+    breslow_surv_times = base[np.newaxis, :] ** np.exp(np.reshape(test_logits, -1))[:, np.newaxis]
+    return np.reshape(breslow_surv_times, (n_samples_test, len(X_test), -1))
 
 def coverage(time_bins, upper, lower, true_times, true_indicator) -> float:
     '''Courtesy of https://github.com/shi-ang/BNN-ISD/tree/main'''
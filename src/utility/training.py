@@ -1,5 +1,4 @@
-from tools.data_loader import (BaseDataLoader, FlchainDataLoader, GbsgDataLoader, MetabricDataLoader,
-                               SupportDataLoader, WhasDataLoader, AidsDataLoader, SeerDataLoader, MimicDataLoader)
+from tools.data_loader import BaseDataLoader, LOADERS
 from tools.preprocessor import Preprocessor
 from typing import Tuple
 import numpy as np
@@ -8,6 +7,13 @@ import pandas as pd
 from sklearn.utils import shuffle
 from skmultilearn.model_selection import iterative_train_test_split
 from sklearn.model_selection import train_test_split
+import joblib
+import paths as pt
+from pathlib import Path
+
+TRANSFORMER_CACHE_BYTES_LIMIT = 10**9
+
+transformer_memory = joblib.Memory(Path.joinpath(pt.CACHE_DIR, "joblib"), verbose=0)
 
 def multilabel_train_test_split(X, y, test_size, random_state=None):
     """Iteratively stratified train/test split
@@ -65,26 +71,9 @@ def make_stratified_split(
     return df_train, df_val, df_test
 
 def get_data_loader(dataset_name:str) -> BaseDataLoader:
-    if dataset_name == "FLCHAIN":
-        return FlchainDataLoader()
-    elif dataset_name == "SEER":
-        return SeerDataLoader()
-    elif dataset_name == "GBSG2":
-        return GbsgDataLoader()
-    elif dataset_name == "METABRIC":
-        return MetabricDataLoader()
-    elif dataset_name == "SUPPORT":
-        return SupportDataLoader()
-    elif dataset_name == "WHAS500":
-        return WhasDataLoader()
-    elif dataset_name == "WHAS500SMALL":
-        return WhasDataLoader()
-    elif dataset_name == "AIDS":
-        return AidsDataLoader()
-    elif dataset_name == "MIMIC":
-        return MimicDataLoader()
-    else:
+    if dataset_name not in LOADERS:
         raise ValueError("Data loader not found")
+    return LOADERS[dataset_name]()
 
 def scale_data(X_train, X_valid, X_test, cat_features, num_features) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     preprocessor = Preprocessor(cat_feat_strat='mode', num_feat_strat='mean')
@@ -95,7 +84,23 @@ def scale_data(X_train, X_valid, X_test, cat_features, num_features) -> Tuple[np
     X_test = transformer.transform(X_test)
     return (X_train, X_valid, X_test)
 
+@transformer_memory.cache
+def _fit_cached_transformer(X_train, cat_features, num_features, cat_feat_strat, num_feat_strat,
+                            one_hot, fill_value):
+    preprocessor = Preprocessor(cat_feat_strat=cat_feat_strat, num_feat_strat=num_feat_strat)
+    return preprocessor.fit(X_train, cat_feats=list(cat_features), num_feats=list(num_features),
+                            one_hot=one_hot, fill_value=fill_value)
+
+def fit_transformer(X_train, cat_features, num_features, cat_feat_strat='mode',
+                    num_feat_strat='mean', one_hot=True, fill_value=-1):
+    # Every argument is hashed, so a different fold, loader or preprocessing setup refits.
+    # The fit lives in this module so spawned agents share cache entries with the main process
+    transformer = _fit_cached_transformer(X_train, tuple(cat_features), tuple(num_features),
+                                          cat_feat_strat, num_feat_strat, one_hot, fill_value)
+    transformer_memory.reduce_size(bytes_limit=TRANSFORMER_CACHE_BYTES_LIMIT)
+    return transformer
+
 def split_time_event(y):
-    y_t = np.array(y['time'])
-    y_e = np.array(y['event'])
+    y_t = y['time'].astype(np.float32)
+    y_e = y['event'].astype(np.bool_)
     return (y_t, y_e)
\ No newline at end of file
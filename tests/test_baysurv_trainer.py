@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+
+import paths as pt
+from tools.baysurv_builder import make_mlp_model, make_mcd_model
+from tools.baysurv_trainer import Trainer
+from utility.loss import CoxPHLoss
+from utility.risk import InputFunction
+
+def make_trainer(model_name, num_epochs, early_stop=False):
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(32, 3)).astype(np.float32)
+    t = rng.uniform(1, 10, size=32).astype(np.float32)
+    e = rng.uniform(size=32) < 0.8
+    train_ds = InputFunction(X[:24], t[:24], e[:24], batch_size=8, drop_last=True, shuffle=True)()
+    valid_ds = InputFunction(X[24:], t[24:], e[24:], batch_size=8)()
+    test_ds = InputFunction(X[24:], t[24:], e[24:], batch_size=8)()
+    if model_name == "mlp":
+        model = make_mlp_model(input_shape=X.shape[1:], output_dim=1, layers=[4], activation_fn="relu",
+                               dropout_rate=0.1, regularization_pen=None)
+    else:
+        model = make_mcd_model(input_shape=X.shape[1:], output_dim=2, layers=[4], activation_fn="relu",
+                               dropout_rate=0.1, regularization_pen=None)
+    return Trainer(model=model, model_name=model_name,
+                   train_dataset=train_ds, valid_dataset=valid_ds,
+                   test_dataset=test_ds, optimizer=tf.keras.optimizers.Adam(),
+                   loss_function=CoxPHLoss(), num_epochs=num_epochs,
+                   early_stop=early_stop, patience=0,
+                   n_samples_train=2, n_samples_valid=2, n_samples_test=2)
+
+@pytest.mark.parametrize("model_name", ["mlp", "mcd1"])
+def test_train_and_evaluate_keeps_one_history_entry_per_epoch(tmp_path, monkeypatch, model_name):
+    monkeypatch.setattr(pt, "MODELS_DIR", tmp_path)
+    trainer = make_trainer(model_name, num_epochs=2)
+    trainer.train_and_evaluate()
+    for history in (trainer.train_loss, trainer.train_variance,
+                    trainer.valid_loss, trainer.valid_variance,
+                    trainer.test_loss, trainer.test_variance):
+        assert len(history) == 2
+    assert np.all(np.isfinite(trainer.train_loss))
+
+def test_train_and_evaluate_without_epochs_leaves_history_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(pt, "MODELS_DIR", tmp_path)
+    trainer = make_trainer("mlp", num_epochs=0)
+    trainer.train_and_evaluate()
+    assert len(trainer.train_loss) == 0
+    assert len(trainer.valid_loss) == 0
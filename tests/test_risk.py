@@ -0,0 +1,51 @@
+import numpy as np
+import tensorflow as tf
+
+from utility.risk import InputFunction, _make_riskset
+
+def reference_riskset(time):
+    # Sort-based construction the in-graph comparison replaced
+    o = np.argsort(-time, kind="mergesort")
+    n_samples = len(time)
+    risk_set = np.zeros((n_samples, n_samples), dtype=np.bool_)
+    for i_org, i_sort in enumerate(o):
+        ti = time[i_sort]
+        k = i_org
+        while k < n_samples and ti == time[o[k]]:
+            k += 1
+        risk_set[i_sort, o[:k]] = True
+    return risk_set
+
+def make_input_fn(n_samples=23, batch_size=5, **kwargs):
+    # The single feature is the sample index, so batches can be traced back
+    data = np.arange(n_samples, dtype=np.float32)[:, np.newaxis]
+    time = np.array([3.0, 1.0, 3.0, 2.0, 5.0, 1.0, 4.0, 2.0] * 3)[:n_samples]
+    event = np.arange(n_samples) % 3 != 0
+    return InputFunction(data, time, event, batch_size=batch_size, **kwargs)
+
+def test_make_riskset_matches_reference_with_ties():
+    time = np.array([3.0, 1.0, 3.0, 2.0, 5.0, 1.0, 4.0, 2.0, 3.0], dtype=np.float32)
+    risk_set = _make_riskset(tf.constant(time)).numpy()
+    np.testing.assert_array_equal(risk_set, reference_riskset(time))
+
+def test_shuffled_batches_cover_every_sample_once_per_epoch():
+    input_fn = make_input_fn(shuffle=True, seed=3)
+    ds = input_fn()
+    for _ in range(2):
+        seen = np.concatenate([x.numpy()[:, 0] for x, _ in ds]).astype(int)
+        np.testing.assert_array_equal(np.sort(seen), np.arange(input_fn.size()))
+
+def test_batch_labels_match_their_samples():
+    input_fn = make_input_fn(shuffle=True, seed=3)
+    for x, labels in input_fn():
+        idx = x.numpy()[:, 0].astype(int)
+        assert labels["label_event"].shape == (len(idx), 1)
+        np.testing.assert_array_equal(labels["label_event"].numpy()[:, 0], input_fn.event[idx])
+        np.testing.assert_array_equal(labels["label_time"].numpy(), input_fn.time[idx])
+        np.testing.assert_array_equal(labels["label_riskset"].numpy(),
+                                      reference_riskset(input_fn.time[idx]))
+
+def test_drop_last_keeps_full_batches_only():
+    input_fn = make_input_fn(drop_last=True)
+    sizes = [x.shape[0] for x, _ in input_fn()]
+    assert sizes == [input_fn.batch_size] * input_fn.steps_per_epoch()
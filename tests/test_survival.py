@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from sksurv.functions import StepFunction
+from sksurv.linear_model.coxph import BreslowEstimator
+
+from utility.survival import convert_to_structured, evaluate_survival_array
+from utility.survival import evaluate_survival_functions, compute_nondeterministic_survival_curve
+
+UNIQUE_TIMES = np.array([1.0, 2.0, 4.0, 7.0])
+SURV = np.array([[0.9, 0.8, 0.5, 0.2],
+                 [0.95, 0.7, 0.6, 0.1],
+                 [0.99, 0.9, 0.4, 0.3]])
+
+def reference_step_values(x, y, times):
+    # Last breakpoint at or before t, held at the first value before the grid starts
+    values = np.empty(len(times))
+    for k, t in enumerate(times):
+        below = np.flatnonzero(x <= t)
+        values[k] = y[below[-1]] if len(below) else y[0]
+    return values
+
+class LinearModel:
+    def __init__(self, weights):
+        self.weights = weights
+
+    def predict(self, X, verbose=False):
+        return (np.asarray(X) @ self.weights)[:, np.newaxis]
+
+def reference_nondeterministic_curve(model, X_train, X_test, e_train, t_train,
+                                     event_times, n_samples_train, n_samples_test):
+    train_cpd = np.zeros((n_samples_train, len(X_train)))
+    for i in range(0, n_samples_train):
+        train_logits = model.predict(X_train, verbose=False)
+        train_cpd[i,:] = np.reshape(train_logits, len(X_train))
+    breslow = BreslowEstimator().fit(np.mean(train_cpd, axis=0), e_train, t_train)
+    breslow_surv_times = np.zeros((n_samples_test, len(X_test), len(event_times)))
+    for i in range(0, n_samples_test):
+        test_logits = model.predict(X_test, verbose=False)
+        surv_fn = breslow.get_survival_function(np.reshape(test_logits, len(X_test)))
+        breslow_surv_times[i] = np.row_stack([fn(event_times) for fn in surv_fn])
+    return breslow_surv_times
+
+def test_convert_to_structured_matches_zipped_records():
+    T = pd.Series([5, 3, 8, 2])
+    E = pd.Series([1, 0, 1, 1])
+    expected = np.array(list(zip(E, T)), dtype={"names": ("event", "time"), "formats": ("bool", "i4")})
+    result = convert_to_structured(T, E)
+    assert result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+
+def test_evaluate_survival_array_matches_loop_including_boundaries():
+    # Before, on, between and after the breakpoints
+    times = np.array([0.0, 0.5, 1.0, 1.5, 2.0, 4.0, 6.9, 7.0, 10.0])
+    expected = np.stack([reference_step_values(UNIQUE_TIMES, row, times) for row in SURV])
+    np.testing.assert_array_equal(evaluate_survival_array(SURV, UNIQUE_TIMES, times), expected)
+
+def test_evaluate_survival_functions_matches_step_function_calls():
+    surv_fn = [StepFunction(UNIQUE_TIMES, row, a=a, b=b)
+               for row, a, b in zip(SURV, [1.0, 0.5, 2.0], [0.0, 0.1, -0.2])]
+    times = np.array([1.0, 1.5, 2.0, 3.9, 4.0, 6.9, 7.0])
+    expected = np.row_stack([fn(times) for fn in surv_fn])
+    np.testing.assert_allclose(evaluate_survival_functions(surv_fn, times), expected)
+
+def test_evaluate_survival_functions_clips_outside_the_grid():
+    surv_fn = [StepFunction(UNIQUE_TIMES, row) for row in SURV]
+    result = evaluate_survival_functions(surv_fn, np.array([0.5, 10.0]))
+    np.testing.assert_array_equal(result, SURV[:, [0, -1]])
+
+def test_compute_nondeterministic_survival_curve_matches_per_sample_loop():
+    rng = np.random.RandomState(0)
+    X_train = rng.normal(size=(30, 3))
+    X_test = rng.normal(size=(5, 3))
+    t_train = rng.uniform(1, 10, size=30)
+    e_train = rng.uniform(size=30) < 0.7
+    event_times = np.quantile(t_train, [0.1, 0.25, 0.5, 0.75, 0.9])
+    model = LinearModel(rng.normal(size=3))
+
+    result = compute_nondeterministic_survival_curve(model, X_train, X_test, e_train, t_train,
+                                                     event_times, n_samples_train=4, n_samples_test=3)
+    expected = reference_nondeterministic_curve(model, X_train, X_test, e_train, t_train,
+                                                event_times, n_samples_train=4, n_samples_test=3)
+    assert result.shape == (3, 5, 5)
+    np.testing.assert_allclose(result, expected)
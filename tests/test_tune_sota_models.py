@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import paths as pt
+from tuning import tune_sota_models
+from utility.survival import convert_to_structured
+
+class CountingDataLoader:
+    n_loads = 0
+
+    def load_data(self):
+        CountingDataLoader.n_loads += 1
+        self.X = pd.DataFrame({"age": [50.0, 60.0, 70.0, 80.0],
+                               "sex": pd.Categorical(["m", "f", "m", "f"])})
+        self.y = convert_to_structured(pd.Series([5, 3, 8, 2]), pd.Series([1, 0, 1, 1]))
+        return self
+
+    def get_features(self):
+        return ["age"], ["sex"]
+
+def test_load_dataset_miss_then_hit(tmp_path, monkeypatch):
+    monkeypatch.setattr(pt, "CACHE_DIR", tmp_path)
+    monkeypatch.setitem(tune_sota_models.data_loader.LOADERS, "COUNTING", CountingDataLoader)
+    CountingDataLoader.n_loads = 0
+
+    df_miss, num_miss, cat_miss = tune_sota_models.load_dataset("COUNTING")
+    assert CountingDataLoader.n_loads == 1
+    cache_key = tune_sota_models.dataset_cache_key("COUNTING")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{cache_key}.npz", f"{cache_key}.parquet"]
+
+    df_hit, num_hit, cat_hit = tune_sota_models.load_dataset("COUNTING")
+    assert CountingDataLoader.n_loads == 1
+    assert (num_hit, cat_hit) == (num_miss, cat_miss) == (["age"], ["sex"])
+    pd.testing.assert_frame_equal(df_hit, df_miss)
+    np.testing.assert_array_equal(df_hit["time"], [5, 3, 8, 2])
+    np.testing.assert_array_equal(df_hit["event"], [True, False, True, True])
+
+def test_dataset_cache_key_changes_with_cache_version(monkeypatch):
+    monkeypatch.setitem(tune_sota_models.data_loader.LOADERS, "COUNTING", CountingDataLoader)
+    old_key = tune_sota_models.dataset_cache_key("COUNTING")
+    monkeypatch.setattr(tune_sota_models, "CACHE_VERSION", tune_sota_models.CACHE_VERSION + 1)
+    new_key = tune_sota_models.dataset_cache_key("COUNTING")
+    assert old_key.startswith("COUNTING_") and new_key.startswith("COUNTING_")
+    assert old_key != new_key